@@ -2,6 +2,23 @@
 
 import collections.abc
 import csv
+import datetime
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from functools import partial
+from itertools import compress
+from operator import eq
+
+from structly.reader import CategoricalColumn
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 def read_rides_as_tuples(filename):
@@ -121,12 +138,71 @@ def read_rides_as_objects_with_slots(filename):
     return records
 
 
+def parse_date(text):
+    """
+    Turn a MM/DD/YYYY date into its proleptic Gregorian ordinal day number
+    """
+    month, day, year = text.split("/")
+    return datetime.date(int(year), int(month), int(day)).toordinal()
+
+
+def date_span(start, end):
+    """
+    The day numbers from start to end (MM/DD/YYYY), inclusive, as a range
+    that can be given as a where condition on a date column
+    """
+    return range(parse_date(start), parse_date(end) + 1)
+
+
+class DateColumn(collections.abc.Sequence):
+    """
+    A column of MM/DD/YYYY dates, each parsed once into an ordinal day
+    number. The year and month of every row are kept alongside, so that
+    filtering by them needs no string handling. Items read back as the
+    original text.
+    """
+
+    def __init__(self):
+        self.days = array("l")
+        self.years = array("H")
+        self.months = array("B")
+        # Dates repeat once per route, so parse each distinct one only once
+        self._parsed = {}
+        self._text = {}
+
+    def __len__(self):
+        return len(self.days)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            col = DateColumn.__new__(DateColumn)
+            col.__dict__.update(self.__dict__)
+            col.days = self.days[index]
+            col.years = self.years[index]
+            col.months = self.months[index]
+            return col
+        return self._text[self.days[index]]
+
+    def append(self, text):
+        parsed = self._parsed.get(text)
+        if parsed is None:
+            day = parse_date(text)
+            month, _, year = text.split("/")
+            parsed = self._parsed[text] = (day, int(year), int(month))
+            self._text.setdefault(day, text)
+        day, year, month = parsed
+        self.days.append(day)
+        self.years.append(year)
+        self.months.append(month)
+
+
 def read_rides_as_columns(filename):
     """
-    Read the bus ride data into 4 lists, representing columns
+    Read the bus ride data into 4 columns. Dates are a DateColumn, the rest
+    are lists.
     """
     routes = []
-    dates = []
+    dates = DateColumn()
     daytypes = []
     numrides = []
     with open(filename) as f:
@@ -142,44 +218,259 @@ def read_rides_as_columns(filename):
 
 class RideData(collections.abc.Sequence):
     def __init__(self):
-        # Each value is a list with all of the values (a column)
-        self.routes = []
-        self.dates = []
-        self.daytypes = []
-        self.numrides = []
+        # Each value is a column. Routes and day types repeat a lot, so they
+        # are dictionary-encoded rather than kept as a string per row.
+        self.routes = CategoricalColumn()
+        self.dates = DateColumn()
+        self.daytypes = CategoricalColumn()
+        self.numrides = array("l")
+        # Slices are views sharing the columns above, over this range of rows
+        self.rows = None
 
     def __len__(self):
-        # All lists assumed to have the same length
-        return len(self.routes)
+        # All columns assumed to have the same length
+        return len(self.numrides) if self.rows is None else len(self.rows)
 
     def __getitem__(self, index):
-        if isinstance(index, int):
-            return {
-                "route": self.routes[index],
-                "date": self.dates[index],
-                "daytype": self.daytypes[index],
-                "rides": self.numrides[index],
-            }
-        elif isinstance(index, slice):
-            slice_output = []
-            for idx in range(*index.indices(len(self.routes))):
-                slice_output.append(
-                    {
-                        "route": self.routes[idx],
-                        "date": self.dates[idx],
-                        "daytype": self.daytypes[idx],
-                        "rides": self.numrides[idx],
-                    }
-                )
-            return slice_output
+        rows = range(len(self.numrides)) if self.rows is None else self.rows
+        if isinstance(index, slice):
+            view = RideData.__new__(RideData)
+            view.__dict__.update(self.__dict__)
+            view.rows = rows[index]
+            return view
+        idx = rows[index]
+        return {
+            "route": self.routes[idx],
+            "date": self.dates[idx],
+            "daytype": self.daytypes[idx],
+            "rides": self.numrides[idx],
+        }
+
+    def column(self, name):
+        return {
+            "route": self.routes,
+            "date": self.dates,
+            "daytype": self.daytypes,
+            "rides": self.numrides,
+            "year": self.dates.years,
+            "month": self.dates.months,
+            "day": self.dates.days,
+        }[name]
+
+    def group_sum(self, key="route", value="rides", where=None):
+        """
+        Total of the value column for each distinct key, as a Counter. where
+        maps column names to a value to match, a range the value must fall
+        in, or a predicate that the column's value must satisfy. Predicates
+        on dictionary-encoded columns are evaluated once per distinct value,
+        not once per row. Besides the row fields, the "year", "month" and
+        "day" (ordinal) parts of the date can be used, e.g.
+
+            rides.group_sum(where={"year": 2011})
+            rides.group_sum(where={"date": date_span("01/01/2011", "06/30/2011")})
+
+        Uses NumPy when it is available.
+        """
+        rows = range(len(self.numrides)) if self.rows is None else self.rows
+        # Row ranges of views turned into slices. A stop of -1 when stepping
+        # backwards means "through row 0".
+        sl = slice(rows.start, None if rows.stop < 0 else rows.stop, rows.step)
+        keys = self.column(key)
+        values = self.column(value)
+        mask = self._where_mask(where or {}, sl)
+
+        if np is not None and isinstance(keys, CategoricalColumn):
+            codes = np.frombuffer(keys.codes, keys.codes.typecode)[sl].astype(np.intp)
+            weights = np.frombuffer(values, values.typecode)[sl]
+            if mask is not None:
+                codes = codes[mask]
+                weights = weights[mask]
+            ncategories = len(keys.categories)
+            sums = np.bincount(codes, weights=weights, minlength=ncategories)
+            counts = np.bincount(codes, minlength=ncategories)
+            return Counter(
+                {keys.categories[c]: int(sums[c]) for c in np.flatnonzero(counts)}
+            )
+
+        if isinstance(keys, CategoricalColumn):
+            pairs = zip(keys.codes[sl], values[sl])
+        else:
+            pairs = zip(keys[sl], values[sl])
+        if mask is not None:
+            pairs = compress(pairs, mask)
+        totals = Counter()
+        for k, v in pairs:
+            totals[k] += v
+        if isinstance(keys, CategoricalColumn):
+            totals = Counter({keys.categories[c]: v for c, v in totals.items()})
+        return totals
+
+    def _where_mask(self, where, sl):
+        # A sequence of booleans selecting rows, or None to select them all
+        mask = None
+        for name, cond in where.items():
+            col = self.column(name)
+            if isinstance(col, DateColumn) and not callable(cond):
+                # Match dates by day number rather than by their text
+                col = col.days
+                if isinstance(cond, str):
+                    cond = parse_date(cond)
+            if callable(cond):
+                test = cond
+            elif isinstance(cond, range):
+                test = cond.__contains__
+            else:
+                test = partial(eq, cond)
+            if isinstance(col, array) and np is not None and not callable(cond):
+                values = np.frombuffer(col, col.typecode)[sl]
+                if isinstance(cond, range) and cond.step == 1:
+                    selected = (values >= cond.start) & (values < cond.stop)
+                elif isinstance(cond, range):
+                    selected = np.isin(values, cond)
+                else:
+                    selected = values == cond
+            elif isinstance(col, CategoricalColumn):
+                allowed = [bool(test(val)) for val in col.categories]
+                if np is not None:
+                    codes = np.frombuffer(col.codes, col.codes.typecode)[sl]
+                    selected = np.array(allowed, dtype=bool)[codes]
+                else:
+                    selected = [allowed[code] for code in col.codes[sl]]
+            elif np is not None:
+                selected = np.fromiter(map(test, col[sl]), dtype=bool)
+            else:
+                selected = [bool(test(val)) for val in col[sl]]
+            if mask is None:
+                mask = selected
+            elif np is not None:
+                mask = mask & selected
+            else:
+                mask = [a and b for a, b in zip(mask, selected)]
+        return mask
 
     def append(self, d):
+        if self.rows is not None:
+            raise TypeError("Can't append to a slice of RideData")
         self.routes.append(d["route"])
         self.dates.append(d["date"])
         self.daytypes.append(d["daytype"])
         self.numrides.append(d["rides"])
 
 
+# A ride index file holds a header (magic, size and mtime of the CSV file it
+# was built from, entry count) followed by fixed-size entries of route, date
+# as YYYYMMDD and the byte offset of the row, sorted by route and date.
+INDEX_MAGIC = b"RIDEIDX1"
+INDEX_HEADER = struct.Struct("<8sQQQ")
+INDEX_ENTRY = struct.Struct("<8sIQ")
+
+
+def date_key(date):
+    """
+    Turn a MM/DD/YYYY date into a sortable YYYYMMDD integer
+    """
+    month, day, year = date.split("/")
+    return int(year) * 10000 + int(month) * 100 + int(day)
+
+
+def build_ride_index(filename, indexname=None):
+    """
+    Write a sorted (route, date) index of the bus ride data, by default to
+    filename + ".idx"
+    """
+    if indexname is None:
+        indexname = filename + ".idx"
+    entries = []
+    with open(filename, "rb") as f:
+        offset = len(f.readline())  # Skip headers
+        for line in f:
+            if b'"' in line:
+                route, date = next(csv.reader([line.decode()]))[:2]
+            else:
+                route, date = line.decode().split(",", 2)[:2]
+            route = route.encode()
+            if len(route) > 8:
+                raise ValueError(f"Route {route!r} is too long to index")
+            entries.append((route, date_key(date), offset))
+            offset += len(line)
+        stat = os.fstat(f.fileno())
+    entries.sort()
+
+    data = bytearray(INDEX_HEADER.size + INDEX_ENTRY.size * len(entries))
+    INDEX_HEADER.pack_into(
+        data, 0, INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(entries)
+    )
+    for n, entry in enumerate(entries):
+        INDEX_ENTRY.pack_into(data, INDEX_HEADER.size + n * INDEX_ENTRY.size, *entry)
+    with open(indexname + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(indexname + ".tmp", indexname)
+
+
+class RideIndex:
+    """
+    Point lookups of bus ride data by route and date, by binary search of
+    a memory-mapped index file. The index is (re)built if it is missing or
+    older than the data.
+    """
+
+    def __init__(self, filename, indexname=None):
+        if indexname is None:
+            indexname = filename + ".idx"
+        self.file = open(filename, "rb")
+        stat = os.fstat(self.file.fileno())
+        if not self._current(indexname, stat):
+            build_ride_index(filename, indexname)
+        with open(indexname, "rb") as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        *_, self.count = INDEX_HEADER.unpack_from(self.index, 0)
+
+    @staticmethod
+    def _current(indexname, stat):
+        try:
+            with open(indexname, "rb") as f:
+                header = f.read(INDEX_HEADER.size)
+            magic, size, mtime, _ = INDEX_HEADER.unpack(header)
+        except (OSError, struct.error):
+            return False
+        return (magic, size, mtime) == (INDEX_MAGIC, stat.st_size, stat.st_mtime_ns)
+
+    def _entry(self, n):
+        offset = INDEX_HEADER.size + n * INDEX_ENTRY.size
+        return INDEX_ENTRY.unpack_from(self.index, offset)
+
+    def lookup(self, route, date):
+        """
+        All rows for the route on the date (MM/DD/YYYY), as dicts
+        """
+        target = (route.encode().ljust(8, b"\0"), date_key(date))
+        n = bisect_left(range(self.count), target, key=lambda n: self._entry(n)[:2])
+        records = []
+        while n < self.count:
+            *key, offset = self._entry(n)
+            if tuple(key) != target:
+                break
+            self.file.seek(offset)
+            route, date, daytype, rides = next(
+                csv.reader([self.file.readline().decode()])
+            )
+            records.append(
+                {"route": route, "date": date, "daytype": daytype, "rides": int(rides)}
+            )
+            n += 1
+        return records
+
+    def close(self):
+        self.index.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, ty, val, tb):
+        self.close()
+
+
 if __name__ == "__main__":
     import tracemalloc
 
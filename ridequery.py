@@ -0,0 +1,169 @@
+# ridequery.py
+#
+# Several aggregations over the bus ride data, computed together in a
+# single pass. Register the aggregations on a Query, then run it over
+# any iterable of rides, such as the stream from iter_rides():
+#
+#     query = Query()
+#     query.register("totals", GroupSum("route", "rides"))
+#     query.register("routes", Distinct("route"))
+#     results = query.run(iter_rides("Data/ctabus.csv"))
+
+import csv
+from abc import ABC, abstractmethod
+from collections import Counter, namedtuple
+from operator import attrgetter
+
+Ride = namedtuple("Ride", ["route", "date", "daytype", "rides"])
+
+
+def iter_rides(filename):
+    """
+    Stream the bus ride data as Ride tuples, without loading the whole file
+    """
+    with open(filename) as f:
+        rows = csv.reader(f)
+        _headings = next(rows)  # Skip headers
+        for route, date, daytype, rides in rows:
+            yield Ride(route, date, daytype, int(rides))
+
+
+def year(ride):
+    """
+    The year of a ride, as the text of its MM/DD/YYYY date. A stream sees
+    each row only once, so unlike readrides.DateColumn, which parses the
+    dates it stores for repeated queries, it is cheaper to slice the text
+    than to parse it.
+    """
+    return ride.date[-4:]
+
+
+def _getter(field):
+    return attrgetter(field) if isinstance(field, str) else field
+
+
+class Aggregation(ABC):
+    """
+    Base class of the aggregations. where is an optional predicate that
+    selects the rides to include. Fields are given by attribute name or as
+    a function of the ride.
+    """
+
+    def __init__(self, where=None):
+        self.where = where
+
+    @abstractmethod
+    def update(self, ride):
+        pass
+
+    @abstractmethod
+    def result(self):
+        pass
+
+
+class Distinct(Aggregation):
+    """
+    The set of distinct values of a field
+    """
+
+    def __init__(self, field, where=None):
+        super().__init__(where)
+        self.get = _getter(field)
+        self.values = set()
+
+    def update(self, ride):
+        self.values.add(self.get(ride))
+
+    def result(self):
+        return self.values
+
+
+class Sum(Aggregation):
+    """
+    The total of a field
+    """
+
+    def __init__(self, value="rides", where=None):
+        super().__init__(where)
+        self.get = _getter(value)
+        self.total = 0
+
+    def update(self, ride):
+        self.total += self.get(ride)
+
+    def result(self):
+        return self.total
+
+
+class GroupSum(Aggregation):
+    """
+    The total of the value field for each distinct key, as a Counter
+    """
+
+    def __init__(self, key, value="rides", where=None):
+        super().__init__(where)
+        self.key = _getter(key)
+        self.get = _getter(value)
+        self.totals = Counter()
+
+    def update(self, ride):
+        self.totals[self.key(ride)] += self.get(ride)
+
+    def result(self):
+        return self.totals
+
+
+class GroupChange(GroupSum):
+    """
+    The change in the total of the value field for each key between the
+    start and end periods, as a Counter. period maps a ride to the period
+    it falls in, e.g. year().
+    """
+
+    def __init__(self, key, value, period, start, end, where=None):
+        super().__init__(key, value, where)
+        self.period = period
+        self.start = start
+        self.end = end
+
+    def update(self, ride):
+        period = self.period(ride)
+        if period == self.end:
+            self.totals[self.key(ride)] += self.get(ride)
+        elif period == self.start:
+            self.totals[self.key(ride)] -= self.get(ride)
+
+
+class Query:
+    """
+    A set of named aggregations, evaluated together in one pass
+    """
+
+    def __init__(self):
+        self.aggregations = {}
+
+    def register(self, name, aggregation):
+        if name in self.aggregations:
+            raise ValueError(f"Aggregation {name!r} already registered")
+        self.aggregations[name] = aggregation
+        return aggregation
+
+    def run(self, rides):
+        """
+        Feed every ride to each aggregation, returning a dict of the
+        results by name. The aggregations keep their state, so a query
+        is only run once.
+        """
+        everything = [a.update for a in self.aggregations.values() if a.where is None]
+        filtered = [
+            (a.where, a.update)
+            for a in self.aggregations.values()
+            if a.where is not None
+        ]
+        for ride in rides:
+            for update in everything:
+                update(ride)
+            for where, update in filtered:
+                if where(ride):
+                    update(ride)
+        return {name: a.result() for name, a in self.aggregations.items()}
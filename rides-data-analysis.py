@@ -1,30 +1,24 @@
-from collections import Counter
+from ridequery import Distinct, GroupChange, GroupSum, Query, Sum, iter_rides, year
 
-import readrides
-
-rides = readrides.read_rides_as_objects_with_slots("Data/ctabus.csv")
+# All four questions are answered in a single pass over the data
+query = Query()
+query.register("routes", Distinct("route"))
+query.register(
+    "route22",
+    Sum("rides", where=lambda ride: ride.route == "22" and ride.date == "02/02/2011"),
+)
+query.register("total", GroupSum("route", "rides"))
+query.register("increase", GroupChange("route", "rides", year, "2001", "2011"))
+results = query.run(iter_rides("Data/ctabus.csv"))
 
-routes = {ride.route for ride in rides}
-print("1: ", len(routes))
+print("1: ", len(results["routes"]))
 
-print(
-    "2: ",
-    sum(
-        ride.rides for ride in rides if ride.route == "22" and ride.date == "02/02/2011"
-    ),
-)
+print("2: ", results["route22"])
 
-total = Counter()
-for ride in rides:
-    total[ride.route] += ride.rides
+total = results["total"]
 print("3:")
 for route in sorted(total):
     print(route, total[route])
 
-increase = Counter()
-for ride in rides:
-    if ride.date.endswith("/2001"):
-        increase[ride.route] -= ride.rides
-    if ride.date.endswith("/2011"):
-        increase[ride.route] += ride.rides
+increase = results["increase"]
 print("4: ", ",".join([route for route, _count in increase.most_common(5)]))
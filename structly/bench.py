@@ -0,0 +1,243 @@
+# bench.py
+#
+# Timing and memory benchmarks for the hot paths of structly. Run as
+#
+#     python -m structly.bench --rows 100000 > before.json
+#
+# and diff the JSON output of two runs.
+
+import argparse
+import csv
+import json
+import os
+import pkgutil
+import platform
+import random
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from operator import attrgetter
+
+from . import tableformat
+from .reader import (
+    read_binary_columns,
+    read_csv_as_columns,
+    read_csv_as_instances,
+    scan_csv_as_columns,
+)
+from .structure import Structure
+from .tableformat import create_formatter, print_table
+from .validate import Integer, PositiveFloat, PositiveInteger, String, validated
+
+
+class BenchStock(Structure):
+    name = String()
+    shares = PositiveInteger()
+    price = PositiveFloat()
+
+
+class TrustedBenchStock(Structure, trusted=True):
+    name = String()
+    shares = PositiveInteger()
+    price = PositiveFloat()
+
+
+def guarded_init(self, name, shares, price):
+    """
+    The old instantiation path, where every field write from __init__
+    went through the __setattr__ guard and a scan of the _fields list
+    """
+    for field, value in zip(self._fields, (name, shares, price)):
+        if not field.startswith("_") and field not in self._fields:
+            raise AttributeError(f"No attribute {field}")
+        object.__setattr__(self, field, value)
+
+
+def plain_add(x, y):
+    return x + y
+
+
+@validated
+def validated_add(x: Integer, y: Integer) -> Integer:
+    return x + y
+
+
+def make_rows(nrows, seed=0):
+    """
+    Synthetic portfolio rows as lists of strings
+    """
+    rng = random.Random(seed)
+    names = ["AA", "IBM", "CAT", "MSFT", "GE", "GOOG", "HPQ", "XOM"]
+    return [
+        [rng.choice(names), str(rng.randint(1, 1000)), f"{rng.uniform(1, 500):.2f}"]
+        for _ in range(nrows)
+    ]
+
+
+def write_csv(filename, rows):
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "shares", "price"])
+        writer.writerows(rows)
+
+
+def table_formats():
+    """
+    Names of all formats available to create_formatter
+    """
+    path = os.path.join(os.path.dirname(tableformat.__file__), "formats")
+    return sorted(info.name for info in pkgutil.iter_modules([path]))
+
+
+def measure(func, count, repeat=3):
+    """
+    Best time for one call of func, which handles count items, along with
+    the peak memory traced while it runs
+    """
+    seconds = min(timeit.repeat(func, number=1, repeat=repeat))
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "count": count,
+        "seconds": seconds,
+        "per_sec": count / seconds if seconds else None,
+        "peak_memory": peak,
+    }
+
+
+def benchmarks(rows, filename):
+    """
+    Map each benchmark name to a (function, item count) pair
+    """
+    records = [BenchStock.from_row(row) for row in rows]
+    fields = ["name", "shares", "price"]
+    shares = [record.shares for record in records]
+    count = len(rows)
+
+    def read_instances():
+        read_csv_as_instances(filename, BenchStock)
+
+    def read_columns():
+        read_csv_as_columns(filename, [str, int, float])
+
+    def scan_columns():
+        scan_csv_as_columns(filename, [float], columns=["price"])
+
+    binfile = os.path.splitext(filename)[0] + ".bin"
+    with open(binfile, "wb") as out:
+        print_table(records, fields, create_formatter("binary", out=out))
+
+    def read_binary():
+        # Touch every value, since the columns are read lazily
+        for column in read_binary_columns(binfile).column_data:
+            for _ in column:
+                pass
+
+    def from_row():
+        for row in rows:
+            BenchStock.from_row(row)
+
+    def trusted_from_row():
+        for row in rows:
+            TrustedBenchStock.from_row(row)
+
+    def generated_init():
+        for name, nshares, price in records:
+            BenchStock(name, nshares, price)
+
+    def guarded():
+        for name, nshares, price in records:
+            guarded_init(BenchStock.__new__(BenchStock), name, nshares, price)
+
+    def validator_set():
+        s = records[0]
+        for n in shares:
+            s.shares = n
+
+    def plain_call():
+        for n in shares:
+            plain_add(n, n)
+
+    def validated_call():
+        for n in shares:
+            validated_add(n, n)
+
+    def table(name):
+        mode = "wb" if name == "binary" else "w"
+
+        def run():
+            with open(os.devnull, mode) as out:
+                print_table(records, fields, create_formatter(name, out=out))
+
+        return run
+
+    def csv_join():
+        # The csv format as it was before it used csv.writer
+        getter = attrgetter(*fields)
+        with open(os.devnull, "w") as out:
+            out.write(",".join(fields) + "\n")
+            for rowdata in map(getter, records):
+                out.write(",".join(str(d) for d in rowdata) + "\n")
+
+    benches = {
+        "read_csv_as_instances": read_instances,
+        "read_csv_as_columns": read_columns,
+        "scan_csv_as_columns": scan_columns,
+        "read_binary_columns": read_binary,
+        "from_row": from_row,
+        "trusted_from_row": trusted_from_row,
+        "generated_init": generated_init,
+        "guarded_init": guarded,
+        "validator_set": validator_set,
+        "plain_call": plain_call,
+        "validated_call": validated_call,
+    }
+    for name in table_formats():
+        benches[f"print_table_{name}"] = table(name)
+    benches["print_table_csv_join"] = csv_join
+    return {name: (func, count) for name, func in benches.items()}
+
+
+def run(nrows=100000, repeat=3, only=None):
+    rows = make_rows(nrows)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, "portfolio.csv")
+        write_csv(filename, rows)
+        results = {
+            name: measure(func, count, repeat)
+            for name, (func, count) in benchmarks(rows, filename).items()
+            if not only or name in only
+        }
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "rows": nrows,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m structly.bench", description="Benchmark structly hot paths"
+    )
+    parser.add_argument("-n", "--rows", type=int, default=100000)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    parser.add_argument("only", nargs="*", help="names of benchmarks to run")
+    args = parser.parse_args(argv)
+
+    report = run(args.rows, args.repeat, args.only)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
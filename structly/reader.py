@@ -3,75 +3,723 @@
 __all__ = [
     "read_csv_as_dicts",
     "read_csv_as_instances",
+    "iter_csv_as_dicts",
+    "iter_csv_as_instances",
+    "read_csv_as_columns",
+    "read_csv_parallel",
+    "read_binary_columns",
+    "scan_csv_as_columns",
+    "open_csv",
+    "read_many",
     "csv_as_dicts",
     "csv_as_instances",
+    "csv_as_columns",
+    "ColumnData",
+    "CategoricalColumn",
 ]
 
+import bz2
+import collections
+import collections.abc
 import csv
+import gzip
+import io
 import logging
-from collections.abc import Iterable
-from typing import List, Union
+import lzma
+import mmap
+import os
+import queue
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from operator import itemgetter
+from typing import Callable, List, Union
+
+from .tableformat.formats import binary
 
 log = logging.getLogger(__name__)
 
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+# Compressed files are recognised by extension, or else by magic number
+_compressors = [
+    (".gz", b"\x1f\x8b", gzip.GzipFile),
+    (".bz2", b"BZh", bz2.BZ2File),
+    (".xz", b"\xfd7zXZ\x00", lzma.LZMAFile),
+]
+
+
+def _compression(filename):
+    name = os.fspath(filename)
+    for ext, _, opener in _compressors:
+        if name.endswith(ext):
+            return opener
+    with open(filename, "rb") as file:
+        start = file.read(6)
+    for _, magic, opener in _compressors:
+        if start.startswith(magic):
+            return opener
+    return None
+
+
+def open_csv(
+    filename: str, buffer_size: int = DEFAULT_BUFFER_SIZE, threaded: bool = False
+) -> io.TextIOBase:
+    """
+    Open a CSV file for reading as text, transparently decompressing gzip,
+    bz2 and xz files through a buffer of buffer_size bytes. With threaded,
+    decompression runs in a background thread so that it overlaps with
+    parsing.
+    """
+    opener = _compression(filename)
+    if opener is None:
+        return open(filename, buffering=buffer_size)
+    raw = opener(filename)
+    if threaded:
+        raw = _PrefetchReader(raw, buffer_size)
+    return io.TextIOWrapper(io.BufferedReader(raw, buffer_size))
+
+
+class _PrefetchReader(io.RawIOBase):
+    # Reads blocks from a stream in a background thread, a few blocks ahead
+    def __init__(self, raw, block_size, depth=4):
+        self.raw = raw
+        self.block_size = block_size
+        self.blocks = queue.Queue(depth)
+        self.pending = memoryview(b"")
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._fill, daemon=True)
+        self.thread.start()
+
+    def _fill(self):
+        try:
+            while not self.stop.is_set():
+                block = self.raw.read(self.block_size)
+                self._put(block)
+                if not block:
+                    break
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        while not self.stop.is_set():
+            try:
+                self.blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self.pending:
+            block = self.blocks.get()
+            if isinstance(block, Exception):
+                # Leave it for any later reads, as with the end of file
+                self.blocks.put(block)
+                raise block
+            if not block:
+                self.blocks.put(block)
+                return 0
+            self.pending = memoryview(block)
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self.stop.set()
+            self.thread.join()
+            self.raw.close()
+        super().close()
+
 
 def read_csv_as_dicts(
-    filename: str, types: List[type], headers: Union[List[str], None] = None
+    filename: str,
+    types: List[type],
+    headers: Union[List[str], None] = None,
+    where: Union[Callable[[dict], bool], None] = None,
+    fields: Union[List[str], None] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    errors: str = "log",
+    intern: Union[List[str], None] = None,
 ) -> List[dict]:
     """
-    Read CSV data into a list of dictionaries with optional type conversion
+    Read CSV data into a list of dictionaries with optional type conversion.
+    where(row) filters rows on their raw values before conversion, and
+    fields picks the columns to keep, in which case types match fields.
+    errors is "log", "raise", "ignore" or "collect" for bad rows; collect
+    returns a (records, bad_rows) pair with bad_rows as a ColumnData.
     """
-    file = open(filename)
-    return csv_as_dicts(file, types, headers)
+    with open_csv(filename, buffer_size) as file:
+        return csv_as_dicts(file, types, headers, where, fields, errors, intern)
 
 
 def read_csv_as_instances(
-    filename: str, cls: type, headers: Union[List[str], None] = None
+    filename: str,
+    cls: type,
+    headers: Union[List[str], None] = None,
+    where: Union[Callable[[dict], bool], None] = None,
+    fields: Union[List[str], None] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    errors: str = "log",
+    intern: Union[List[str], None] = None,
 ) -> List[type]:
     """
-    Read CSV data into a list of instances
+    Read CSV data into a list of instances. where(row) filters rows on
+    their raw values before conversion, and fields picks the columns that
+    are passed to cls.from_row(). errors is "log", "raise", "ignore" or
+    "collect" for bad rows; collect returns a (records, bad_rows) pair with
+    bad_rows as a ColumnData.
+    """
+    with open_csv(filename, buffer_size) as file:
+        return csv_as_instances(file, cls, headers, where, fields, errors, intern)
+
+
+def iter_csv_as_dicts(
+    filename: str,
+    types: List[type],
+    headers: Union[List[str], None] = None,
+    where: Union[Callable[[dict], bool], None] = None,
+    fields: Union[List[str], None] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    errors: str = "log",
+    intern: Union[List[str], None] = None,
+) -> Iterator[dict]:
+    """
+    Lazily read CSV data as dictionaries, one record at a time. The file
+    is closed when the iterator is exhausted or closed.
     """
-    file = open(filename)
-    return csv_as_instances(file, cls, headers)
+    with open_csv(filename, buffer_size) as file:
+        yield from iter_convert_csv(
+            file,
+            _dict_converter(types),
+            headers,
+            where=where,
+            fields=fields,
+            errors=errors,
+            intern=intern,
+        )
+
+
+def iter_csv_as_instances(
+    filename: str,
+    cls: type,
+    headers: Union[List[str], None] = None,
+    where: Union[Callable[[dict], bool], None] = None,
+    fields: Union[List[str], None] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    errors: str = "log",
+    intern: Union[List[str], None] = None,
+) -> Iterator[type]:
+    """
+    Lazily read CSV data as instances, one record at a time. The file
+    is closed when the iterator is exhausted or closed.
+    """
+    with open_csv(filename, buffer_size) as file:
+        yield from iter_convert_csv(
+            file,
+            _instance_converter(cls),
+            headers,
+            where=where,
+            fields=fields,
+            errors=errors,
+            intern=intern,
+        )
+
+
+def read_csv_as_columns(
+    filename: str,
+    types: List[type],
+    headers: Union[List[str], None] = None,
+    categorical: Union[List[str], None] = None,
+) -> "ColumnData":
+    """
+    Read CSV data into a column store with optional type conversion. The
+    categorical columns are dictionary-encoded, see CategoricalColumn.
+    """
+    with open_csv(filename) as file:
+        return csv_as_columns(file, types, headers, categorical)
+
+
+def read_many(
+    filenames: Union[str, Iterable[str]],
+    cls: type,
+    max_open: int = 4,
+    **kwargs,
+) -> Iterator[tuple]:
+    """
+    Read many CSV files into instances, yielding (filename, records) pairs
+    in order. filenames may also be a directory, whose files are read in
+    sorted order. Files are read by up to max_open threads, so no more
+    than max_open of them are open at once. Other keyword arguments go
+    to read_csv_as_instances().
+    """
+    if isinstance(filenames, (str, os.PathLike)):
+        filenames = sorted(
+            entry.path for entry in os.scandir(filenames) if entry.is_file()
+        )
+    pending = collections.deque()
+    with ThreadPoolExecutor(max_open) as pool:
+        for filename in filenames:
+            if len(pending) >= max_open:
+                done, future = pending.popleft()
+                yield done, future.result()
+            future = pool.submit(read_csv_as_instances, filename, cls, **kwargs)
+            pending.append((filename, future))
+        while pending:
+            filename, future = pending.popleft()
+            yield filename, future.result()
+
+
+def read_csv_parallel(
+    filename: str,
+    cls: type,
+    headers: Union[List[str], None] = None,
+    workers: Union[int, None] = None,
+    chunksize: int = 1 << 22,
+) -> List[type]:
+    """
+    Read CSV data into a list of instances, converting chunks of the file
+    in separate processes. Chunks are split on line boundaries, so quoted
+    values must not contain newlines. Records come back in file order.
+    Compressed files cannot be split, so they are read in this process.
+    """
+    if _compression(filename):
+        return read_csv_as_instances(filename, cls, headers)
+    with open(filename, "rb") as file:
+        if headers is None:
+            file.readline()
+        offsets = [file.tell()]
+        size = os.fstat(file.fileno()).st_size
+        while offsets[-1] < size:
+            file.seek(offsets[-1] + chunksize)
+            file.readline()
+            offsets.append(min(file.tell(), size))
+
+    records = []
+    rownum = 0
+    with ProcessPoolExecutor(workers) as pool:
+        for chunk, nrows, errors in pool.map(
+            _convert_chunk, repeat(filename), offsets, offsets[1:], repeat(cls)
+        ):
+            for n, row, e in errors:
+                log.warning("Row %d: Bad row: %s", rownum + n, row)
+                log.debug("Row %d: Reason : %s", rownum + n, e)
+            records.extend(chunk)
+            rownum += nrows
+    return records
+
+
+def _convert_chunk(filename, start, end, cls):
+    with open(filename, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    records = []
+    errors = []
+    rownum = 0
+    rows = csv.reader(io.TextIOWrapper(io.BytesIO(data)))
+    for rownum, row in enumerate(rows, start=1):
+        try:
+            records.append(cls.from_row(row))
+        except ValueError as e:
+            errors.append((rownum, row, str(e)))
+    return records, rownum, errors
+
+
+def read_binary_columns(filename: str) -> "ColumnData":
+    """
+    Memory-map a file written by the binary table format and return it as
+    a column store. Numeric columns are read in place, without copying.
+    """
+    with open(filename, "rb") as file:
+        view = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    magic, version, ncols = binary.HEADER.unpack_from(view, 0)
+    if magic != binary.MAGIC or version != binary.VERSION:
+        raise ValueError(f"{filename} is not a binary table")
+    pos = binary.HEADER.size
+    names = []
+    typecodes = []
+    for _ in range(ncols):
+        code, size = binary.COLUMN.unpack_from(view, pos)
+        pos += binary.COLUMN.size
+        names.append(str(view[pos : pos + size], "utf-8"))
+        typecodes.append(code.decode())
+        pos += size + len(binary.padding(size))
+
+    blocks = [[] for _ in typecodes]
+    starts = []
+    nrows = 0
+    while pos < len(view):
+        (count,) = binary.BLOCK.unpack_from(view, pos)
+        pos += binary.BLOCK.size
+        for code, column in zip(typecodes, blocks):
+            if code == "s":
+                offsets = _cast(view[pos : pos + 8 * (count + 1)], "q")
+                pos += 8 * (count + 1)
+                size = offsets[-1]
+                column.append(_StringBlock(offsets, view[pos : pos + size]))
+                pos += size + len(binary.padding(size))
+            else:
+                column.append(_cast(view[pos : pos + 8 * count], code))
+                pos += 8 * count
+        starts.append(nrows)
+        nrows += count
+
+    types = {"q": int, "d": float, "s": str}
+    data = ColumnData(names, [types[code] for code in typecodes])
+    if starts:
+        data.column_data = [
+            column[0] if len(column) == 1 else _BlockColumn(column, starts, nrows)
+            for column in blocks
+        ]
+    return data
+
+
+def scan_csv_as_columns(
+    filename: str,
+    types: List[type],
+    columns: Union[List[str], None] = None,
+    headers: Union[List[str], None] = None,
+    delimiter: str = ",",
+    encoding: str = "utf-8",
+    categorical: Union[List[str], None] = None,
+) -> "ColumnData":
+    """
+    Read CSV data into a column store by scanning a memory map of the file.
+    Only the named columns (all by default) are extracted, and types gives
+    their conversions. Lines are split as bytes and only as far as the last
+    column needed. int and float convert straight from bytes; other columns
+    are decoded first. Quoted fields are handled, but not across lines.
+    Compressed files cannot be mapped and raise ValueError.
+    """
+    if _compression(filename):
+        raise ValueError(f"{filename} is compressed and cannot be memory-mapped")
+    with open(filename, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return ColumnData(columns or headers or [], types)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            lines = iter(data.readline, b"")
+            if headers is None:
+                headers = next(csv.reader([next(lines).decode(encoding)], None))
+            if columns is None:
+                columns = headers
+            indices = [headers.index(name) for name in columns]
+            getter = itemgetter(*indices) if len(indices) > 1 else None
+            maxsplit = max(indices, default=0) + 1
+            converters = [_bytes_converter(func, encoding) for func in types]
+            sep = delimiter.encode(encoding)
+            result = ColumnData(columns, types, categorical)
+            for rownum, line in enumerate(lines, start=1):
+                line = line.rstrip(b"\r\n")
+                if not line:
+                    continue
+                if b'"' in line:
+                    row = csv.reader([line.decode(encoding)], delimiter=delimiter)
+                    fields = [val.encode(encoding) for val in next(row)]
+                else:
+                    fields = line.split(sep, maxsplit)
+                try:
+                    values = getter(fields) if getter else [fields[indices[0]]]
+                    record = [func(val) for func, val in zip(converters, values)]
+                except (ValueError, IndexError) as e:
+                    row = [str(val, encoding, "replace") for val in fields]
+                    log.warning("Row %d: Bad row: %s", rownum, row)
+                    log.debug("Row %d: Reason : %s", rownum, e)
+                else:
+                    result.append(record)
+    return result
+
+
+def _bytes_converter(func, encoding):
+    # int() and float() accept bytes as they are, anything else gets text
+    if func in (int, float):
+        return func
+    return lambda val: func(sys.intern(str(val, encoding)))
+
+
+def _cast(view, typecode):
+    if sys.byteorder == "little":
+        return view.cast(typecode)
+    values = array(typecode)
+    values.frombytes(view)
+    values.byteswap()
+    return values
+
+
+class _StringBlock(collections.abc.Sequence):
+    # utf-8 strings packed end to end, decoded only when indexed
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[n] for n in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("index out of range")
+        return str(self.data[self.offsets[index] : self.offsets[index + 1]], "utf-8")
+
+
+class _BlockColumn(collections.abc.Sequence):
+    # A column made of one sequence per block of the file
+    def __init__(self, blocks, starts, nrows):
+        self.blocks = blocks
+        self.starts = starts
+        self.nrows = nrows
+
+    def __len__(self):
+        return self.nrows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[n] for n in range(*index.indices(len(self)))]
+        if index < 0:
+            index += self.nrows
+        if not 0 <= index < self.nrows:
+            raise IndexError("index out of range")
+        block = bisect_right(self.starts, index) - 1
+        return self.blocks[block][index - self.starts[block]]
 
 
 def csv_as_dicts(
-    lines: Iterable[str], types: List[type], headers: Union[List[str], None] = None
+    lines: Iterable[str],
+    types: List[type],
+    headers: Union[List[str], None] = None,
+    where: Union[Callable[[dict], bool], None] = None,
+    fields: Union[List[str], None] = None,
+    errors: str = "log",
+    intern: Union[List[str], None] = None,
 ) -> List[dict]:
     """
     Convert CSV data into a list of dictionaries with optional type conversion
     """
     return convert_csv(
-        lines,
-        lambda headers, row: {
-            name: func(val) for name, func, val in zip(headers, types, row)
-        },
-        headers,
+        lines, _dict_converter(types), headers, where, fields, errors, intern
     )
 
 
 def csv_as_instances(
-    lines: Iterable[str], cls: type, headers: Union[List[str], None] = None
+    lines: Iterable[str],
+    cls: type,
+    headers: Union[List[str], None] = None,
+    where: Union[Callable[[dict], bool], None] = None,
+    fields: Union[List[str], None] = None,
+    errors: str = "log",
+    intern: Union[List[str], None] = None,
 ) -> List[type]:
     """
     Convert CSV data into a list of instances
     """
-    return convert_csv(lines, lambda headers, row: cls.from_row(row), headers)
+    return convert_csv(
+        lines, _instance_converter(cls), headers, where, fields, errors, intern
+    )
 
 
-def convert_csv(lines, func, headers=None):
-    records = []
+def csv_as_columns(
+    lines: Iterable[str],
+    types: List[type],
+    headers: Union[List[str], None] = None,
+    categorical: Union[List[str], None] = None,
+) -> "ColumnData":
+    """
+    Convert CSV data into a column store with optional type conversion
+    """
+    rows = csv.reader(lines)
+    if headers is None:
+        headers = next(rows, [])
+    data = ColumnData(headers, types, categorical)
+    converters = [sys.intern if func is str else func for func in types]
+    for record in iter_convert_rows(
+        rows,
+        lambda headers, row: [func(val) for func, val in zip(converters, row)],
+        headers,
+    ):
+        data.append(record)
+    return data
+
+
+class ColumnData(collections.abc.Sequence):
+    """
+    Column-oriented record storage. int and float columns are kept in
+    arrays, categorical columns as CategoricalColumn and everything else
+    in lists. Rows are only built as dicts when indexed.
+    """
+
+    _typecodes = {int: "q", float: "d"}
+
+    def __init__(self, headers, types, categorical=None):
+        self.column_names = list(headers)
+        self.column_types = list(types)
+        categorical = set(categorical or ())
+        self.column_data = [
+            self._new_column(func, name in categorical)
+            for name, func in zip(self.column_names, self.column_types)
+        ]
+
+    def _new_column(self, func, categorical):
+        if categorical:
+            return CategoricalColumn()
+        if func in self._typecodes:
+            return array(self._typecodes[func])
+        return []
+
+    def __len__(self):
+        return len(self.column_data[0]) if self.column_data else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            data = ColumnData(self.column_names, self.column_types)
+            data.column_data = [col[index] for col in self.column_data]
+            return data
+        return dict(zip(self.column_names, (col[index] for col in self.column_data)))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.column_names!r}, {len(self)} rows)"
+
+    def column(self, name):
+        return self.column_data[self.column_names.index(name)]
+
+    def append(self, values):
+        for col, val in zip(self.column_data, values):
+            col.append(val)
+
+
+class CategoricalColumn(collections.abc.Sequence):
+    """
+    A dictionary-encoded column, for values that repeat a lot. Each distinct
+    value is stored once in categories and rows hold its index as a small
+    integer, widened as the number of categories grows.
+    """
+
+    _wider = {"B": "H", "H": "I", "I": "Q"}
+
+    def __init__(self, categories=None, codes=None):
+        self.categories = [] if categories is None else categories
+        self.index = {value: code for code, value in enumerate(self.categories)}
+        self.codes = array("B") if codes is None else codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            column = CategoricalColumn.__new__(CategoricalColumn)
+            column.categories = self.categories
+            column.index = self.index
+            column.codes = self.codes[index]
+            return column
+        return self.categories[self.codes[index]]
+
+    def __repr__(self):
+        ncategories = len(self.categories)
+        return f"{type(self).__name__}({ncategories} categories, {len(self)} rows)"
+
+    def append(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.categories)
+            self.categories.append(value)
+            if code >> (8 * self.codes.itemsize):
+                self.codes = array(self._wider[self.codes.typecode], self.codes)
+        self.codes.append(code)
+
+
+def _dict_converter(types):
+    return lambda headers, row: {
+        name: func(val) for name, func, val in zip(headers, types, row)
+    }
+
+
+def _instance_converter(cls):
+    return lambda headers, row: cls.from_row(row)
+
+
+def convert_csv(
+    lines, func, headers=None, where=None, fields=None, errors="log", intern=None
+):
+    options = dict(where=where, fields=fields, errors=errors, intern=intern)
+    if errors == "collect":
+        bad_rows = ColumnData(["rownum", "row", "error"], [int, list, type])
+        records = list(
+            iter_convert_csv(lines, func, headers, bad_rows=bad_rows, **options)
+        )
+        return records, bad_rows
+    return list(iter_convert_csv(lines, func, headers, **options))
+
+
+def iter_convert_csv(lines, func, headers=None, **options):
     rows = csv.reader(lines)
     if headers is None:
-        headers = next(rows)
+        headers = next(rows, None)
+        if headers is None:
+            return
+    yield from iter_convert_rows(rows, func, headers, **options)
+
+
+def iter_convert_rows(
+    rows,
+    func,
+    headers,
+    where=None,
+    fields=None,
+    errors="log",
+    bad_rows=None,
+    intern=None,
+):
+    # Bad rows, those whose conversion raises ValueError, are handled
+    # according to errors: "log" a warning, "raise" the error, "ignore" them
+    # or "collect" their row number, raw row and exception type in bad_rows.
+    if errors not in ("log", "raise", "ignore", "collect"):
+        raise ValueError(f"Unknown errors mode {errors!r}")
+    if errors == "collect" and bad_rows is None:
+        raise ValueError("errors='collect' is only supported by list readers")
+
+    # Rows failing where(), which sees the raw strings by column name, are
+    # dropped before conversion. With fields, only those columns are kept
+    # and rows too short to hold them all are bad rows.
+    # Values of the intern columns are replaced by a single shared string
+    interned = [headers.index(name) for name in intern or ()]
+    names = headers
+    if fields is not None:
+        indices = [headers.index(name) for name in fields]
+        ncolumns = max(indices, default=-1) + 1
+        headers = list(fields)
     for rownum, row in enumerate(rows, start=1):
+        if where is not None and not where(dict(zip(names, row))):
+            continue
+        for n in interned:
+            if n < len(row):
+                row[n] = sys.intern(row[n])
         try:
-            record = func(headers, row)
-            records.append(record)
+            # Bad rows are reported as read, not as projected onto fields
+            values = row
+            if fields is not None:
+                if len(row) < ncolumns:
+                    raise ValueError(f"Expected {ncolumns} columns, got {len(row)}")
+                values = [row[n] for n in indices]
+            record = func(headers, values)
         except ValueError as e:
-            log.warning(f"Row {rownum}: Bad row: {row}")
-            log.debug(f"Row {rownum}: Reason : {e}")
-    return records
+            if errors == "log":
+                log.warning("Row %d: Bad row: %s", rownum, row)
+                log.debug("Row %d: Reason : %s", rownum, e)
+            elif errors == "collect":
+                bad_rows.append((rownum, row, type(e)))
+            elif errors == "raise":
+                raise ValueError(f"Row {rownum}: Bad row: {row}") from e
+        else:
+            yield record
 
 
 def parse_line(line):
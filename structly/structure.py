@@ -5,22 +5,44 @@ __all__ = ["Structure"]
 import sys
 from collections import ChainMap
 
+from . import validate
 from .validate import Validator, validated
 
 
 class StructureMeta(type):
     @classmethod
-    def __prepare__(meta, clsname, bases):
+    def __prepare__(meta, clsname, bases, **kwargs):
         return ChainMap({}, Validator.validators)
 
     @staticmethod
-    def __new__(meta, name, bases, methods):
-        methods = methods.maps[0]
+    def __new__(meta, name, bases, methods, slots=False, trusted=None):
+        if isinstance(methods, ChainMap):
+            methods = methods.maps[0]
+        if trusted is None:
+            trusted = validate.trusted
+        if slots or trusted:
+            # Validators move out of the class so that field values are
+            # stored without going through them. Slots take their names and
+            # checking, unless trusted, is done by _slotted_setattr instead.
+            validators = {
+                key: val for key, val in methods.items() if isinstance(val, Validator)
+            }
+            for key, val in validators.items():
+                del methods[key]
+                val.__set_name__(None, key)
+            methods["_field_validators"] = validators
+            if slots:
+                methods["__slots__"] = tuple(validators)
+                if not trusted:
+                    methods["__setattr__"] = _slotted_setattr
+        methods["_trusted"] = trusted
         return super().__new__(meta, name, bases, methods)
 
 
 class Structure(metaclass=StructureMeta):
+    __slots__ = ()
     _types = ()
+    _trusted = False
 
     @staticmethod
     def _init():
@@ -30,7 +52,7 @@ class Structure(metaclass=StructureMeta):
             setattr(self, name, val)
 
     def __setattr__(self, name, value):
-        if not name.startswith("_") and name not in self._fields:
+        if not name.startswith("_") and name not in self._fieldset:
             raise AttributeError(f"No attribute {name}")
         super().__setattr__(name, value)
 
@@ -54,13 +76,59 @@ class Structure(metaclass=StructureMeta):
 
     @classmethod
     def create_init(cls):
+        # Fields are checked and stored directly, skipping the __setattr__ guard
+        env = {}
         argstr = ",".join(cls._fields)
         code = f"def __init__(self, {argstr}):\n"
-        for name in cls._fields:
-            code += f"    self.{name} = {name}\n"
-        locs = {}
-        exec(code, locs)
-        cls.__init__ = locs["__init__"]
+        code += cls._store_fields(cls._fields, env)
+        exec(code, env)
+        cls.__init__ = env["__init__"]
+
+    @classmethod
+    def create_from_row(cls):
+        # Inline each field's type conversion along with the validator checks
+        env = {}
+        values = []
+        for n, validator in enumerate(cls._validators):
+            value = f"row[{n}]"
+            if hasattr(validator, "expected_type"):
+                env[f"_type{n}"] = validator.expected_type
+                value = f"_type{n}({value})"
+            if getattr(validator, "intern", False):
+                env["_intern"] = sys.intern
+                value = f"_intern({value})"
+            values.append(value)
+        nfields = len(cls._fields)
+        code = "def from_row(cls, row):\n"
+        # A short row is bad data, like a value that fails to convert
+        code += f"    if len(row) < {nfields}:\n"
+        code += (
+            "        raise ValueError("
+            f"f'Expected {nfields} values, got {{len(row)}}')\n"
+        )
+        code += "    self = cls.__new__(cls)\n"
+        code += cls._store_fields(values, env)
+        code += "    return self\n"
+        exec(code, env)
+        cls.from_row = classmethod(env["from_row"])
+
+    @classmethod
+    def _store_fields(cls, values, env):
+        # Code storing each checked value into the instance dict or slot
+        slotted = "__slots__" in vars(cls)
+        code = "" if slotted else "    d = self.__dict__\n"
+        for n, (name, validator, value) in enumerate(
+            zip(cls._fields, cls._validators, values)
+        ):
+            if not cls._trusted:
+                env[f"_check{n}"] = validator.check
+                value = f"_check{n}({value})"
+            if slotted:
+                env[f"_set{n}"] = vars(cls)[name].__set__
+                code += f"    _set{n}(self, {value})\n"
+            else:
+                code += f"    d[{name!r}] = {value}\n"
+        return code
 
     @classmethod
     def from_row(cls, row):
@@ -68,27 +136,44 @@ class Structure(metaclass=StructureMeta):
         return cls(*rowdata)
 
 
+def _slotted_setattr(self, name, value):
+    validator = self._field_validators.get(name)
+    if validator is not None:
+        value = validator.check(value)
+    elif not name.startswith("_"):
+        raise AttributeError(f"No attribute {name}")
+    object.__setattr__(self, name, value)
+
+
 def validate_attributes(cls):
     validators = []
     types = []
-    for name, val in vars(cls).items():
+    # Slotted and trusted classes keep their validators aside, in order
+    attrs = dict(vars(cls).get("_field_validators", {}))
+    attrs.update((key, val) for key, val in vars(cls).items() if key not in attrs)
+    for name, val in attrs.items():
         if isinstance(val, Validator):
             validators.append(val)
             if hasattr(val, "expected_type"):
                 types.append(val.expected_type)
         elif hasattr(val, "__annotations__"):
             for name2, val2 in val.__annotations__.items():
-                if issubclass(val2, Validator):
+                if issubclass(val2, Validator) and not cls._trusted:
                     setattr(cls, name, validated(val))
 
     cls._fields = [val.name for val in validators]
+    cls._fieldset = frozenset(cls._fields)
+    cls._validators = validators
     cls._types = types
 
     cls.create_init()
+    cls.create_from_row()
 
     return cls
 
 
 def typed_structure(clsname, **validators):
     cls = type(clsname, (Structure,), validators)
+    # Record the caller's module so instances can be pickled by reference
+    cls.__module__ = sys._getframe(1).f_globals["__name__"]
     return cls
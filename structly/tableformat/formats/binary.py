@@ -0,0 +1,109 @@
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+from ..formatter import TableFormatter
+
+# A compact columnar table format, read back by structly.read_binary_columns.
+# Everything is little-endian and padded to 8 byte boundaries so columns can
+# be used straight out of a memory map.
+#
+#   HEADER   magic, version and column count
+#   COLUMN   per column: type code (q = int, d = float, s = str) and the
+#            length of the utf-8 column name that follows
+#   BLOCK    row count, followed by each column in turn: packed values for
+#            numbers, or nrows + 1 offsets ('q') and the utf-8 data for strings
+#
+# Blocks repeat until the end of the file.
+
+MAGIC = b"STRUCTLY"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+COLUMN = struct.Struct("<c3xI")
+BLOCK = struct.Struct("<Q")
+TYPECODES = {int: "q", float: "d"}
+
+
+def padding(size):
+    return b"\0" * (-size % 8)
+
+
+def typecode(values):
+    """
+    The type code for a column holding values: q if they are all ints, d
+    if they are ints and floats, and s otherwise
+    """
+    kinds = set(map(type, values))
+    if kinds and kinds <= {int}:
+        return "q"
+    if kinds and kinds <= {int, float}:
+        return "d"
+    return "s"
+
+
+class BinaryTableFormatter(TableFormatter):
+    buffer_rows = 65536
+
+    def __init__(self, out=None, buffer_rows=None, types=None):
+        # Rows are always written in blocks of buffer_rows, even to stdout.
+        # Column types come from types if given, or else from the values in
+        # the first block.
+        super().__init__(out, buffer_rows)
+        self.headers = []
+        self.types = types
+        self.typecodes = None
+        self._header_written = False
+        if types is not None:
+            self.typecodes = [TYPECODES.get(ty, "s") for ty in types]
+
+    def headings(self, headers):
+        self.headers = list(headers)
+
+    def row(self, rowdata):
+        self.write(rowdata)
+
+    def rows(self, rows):
+        self.writelines(rows)
+
+    def flush(self):
+        out = self.out if self.out is not None else sys.stdout.buffer
+        if not self._header_written:
+            if self.typecodes is None:
+                columns = list(zip(*self._buffer)) or [()] * len(self.headers)
+                self.typecodes = [typecode(values) for values in columns]
+            out.write(self.encode_header())
+            self._header_written = True
+        if self._buffer:
+            rows = self._buffer[:]
+            self._buffer.clear()
+            out.write(self.encode_block(rows))
+
+    def encode_header(self):
+        parts = [HEADER.pack(MAGIC, VERSION, len(self.headers))]
+        for name, code in zip(self.headers, self.typecodes):
+            name = name.encode("utf-8")
+            parts += [COLUMN.pack(code.encode(), len(name)), name, padding(len(name))]
+        return b"".join(parts)
+
+    def encode_block(self, rows):
+        parts = [BLOCK.pack(len(rows))]
+        for name, code, values in zip(self.headers, self.typecodes, zip(*rows)):
+            if code == "s":
+                values = [str(val).encode("utf-8") for val in values]
+                offsets = array("q", accumulate(map(len, values), initial=0))
+                data = b"".join(values)
+                values = [offsets, data, padding(len(data))]
+            elif typecode(values) not in (code, "q"):
+                # Nothing of the block has been written, so the output so far
+                # is still a complete table
+                message = f"Column {name!r} has values that don't fit its type {code!r}"
+                if self.types is None:
+                    message += ", guessed from the first block; pass types="
+                raise TypeError(message)
+            else:
+                values = [array(code, values)]
+            if sys.byteorder == "big" and isinstance(values[0], array):
+                values[0].byteswap()
+            parts += values
+        return b"".join(parts)
@@ -1,9 +1,26 @@
+import csv
+
 from ..formatter import TableFormatter
 
 
+class table(csv.excel):
+    # Excel quoting rules, but with the plain newlines print() used to give
+    lineterminator = "\n"
+
+
 class CSVTableFormatter(TableFormatter):
+    def __init__(self, out=None, buffer_rows=None, dialect=table, **fmtparams):
+        super().__init__(out, buffer_rows)
+        self.writer = csv.writer(self, dialect, **fmtparams)
+
     def headings(self, headers):
-        print(",".join(headers))
+        self.writer.writerow(headers)
+        self._flush_stdout()
 
     def row(self, rowdata):
-        print(",".join(str(d) for d in rowdata))
+        self.writer.writerow(rowdata)
+        self._flush_stdout()
+
+    def rows(self, rows):
+        self.writer.writerows(rows)
+        self._flush_stdout()
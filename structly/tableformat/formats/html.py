@@ -3,7 +3,20 @@ from ..formatter import TableFormatter
 
 class HTMLTableFormatter(TableFormatter):
     def headings(self, headers):
-        print("<tr>", " ".join("<th>" + h + "</th>" for h in headers), "</tr>")
+        self.write(
+            "<tr> " + " ".join("<th>" + h + "</th>" for h in headers) + " </tr>\n"
+        )
+        self._flush_stdout()
 
     def row(self, rowdata):
-        print("<tr>", " ".join("<td>" + str(d) + "</td>" for d in rowdata), "</tr>")
+        self.write(
+            "<tr> " + " ".join("<td>" + str(d) + "</td>" for d in rowdata) + " </tr>\n"
+        )
+        self._flush_stdout()
+
+    def rows(self, rows):
+        cell = "<td>{}</td>".format
+        self.writelines(
+            "<tr> " + " ".join(map(cell, rowdata)) + " </tr>\n" for rowdata in rows
+        )
+        self._flush_stdout()
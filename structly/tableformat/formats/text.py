@@ -3,8 +3,15 @@ from ..formatter import TableFormatter
 
 class TextTableFormatter(TableFormatter):
     def headings(self, headers):
-        print(" ".join("%10s" % h for h in headers))
-        print(("-" * 10 + " ") * len(headers))
+        self.write(" ".join("%10s" % h for h in headers) + "\n")
+        self.write(("-" * 10 + " ") * len(headers) + "\n")
+        self._flush_stdout()
 
     def row(self, rowdata):
-        print(" ".join("%10s" % d for d in rowdata))
+        self.write(" ".join("%10s" % d for d in rowdata) + "\n")
+        self._flush_stdout()
+
+    def rows(self, rows):
+        fmt = "%10s".__mod__
+        self.writelines(" ".join(map(fmt, rowdata)) + "\n" for rowdata in rows)
+        self._flush_stdout()
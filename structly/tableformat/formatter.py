@@ -1,4 +1,7 @@
+import sys
 from abc import ABC, abstractmethod
+from itertools import islice
+from operator import attrgetter
 
 
 class UpperHeadersMixin:
@@ -13,15 +16,64 @@ class ColumnFormatMixin:
         rowdata = [(fmt % d) for fmt, d in zip(self.formats, rowdata)]
         super().row(rowdata)
 
+    def rows(self, rows):
+        formats = self.formats
+        super().rows(
+            [(fmt % d) for fmt, d in zip(formats, rowdata)] for rowdata in rows
+        )
+
 
 class TableFormatter(ABC):
     _formats = {}
+    buffer_rows = 1024
+
+    def __init__(self, out=None, buffer_rows=None):
+        # Output is collected and written to out (sys.stdout by default)
+        # in blocks of buffer_rows lines, and on flush() or close()
+        self.out = out
+        if buffer_rows is not None:
+            self.buffer_rows = buffer_rows
+        self._buffer = []
 
     @classmethod
     def __init_subclass__(cls):
         name = cls.__module__.split(".")[-1]
         TableFormatter._formats[name] = cls
 
+    def write(self, text):
+        self._buffer.append(text)
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush()
+
+    def writelines(self, lines):
+        lines = iter(lines)
+        while True:
+            self._buffer.extend(islice(lines, self.buffer_rows - len(self._buffer)))
+            if len(self._buffer) < self.buffer_rows:
+                break
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            out = self.out if self.out is not None else sys.stdout
+            out.write("".join(self._buffer))
+            self._buffer.clear()
+
+    def close(self):
+        self.flush()
+
+    def _flush_stdout(self):
+        # Formats call this at the end of headings(), row() and rows(), so
+        # that output to the default sys.stdout shows up as it is produced
+        if self.out is None:
+            self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, ty, val, tb):
+        self.close()
+
     @abstractmethod
     def headings(self, headers):
         pass
@@ -30,8 +82,19 @@ class TableFormatter(ABC):
     def row(self, rowdata):
         pass
 
+    def rows(self, rows):
+        for rowdata in rows:
+            self.row(rowdata)
+
 
-def create_formatter(name, column_formats=None, upper_headers=False):
+def create_formatter(
+    name,
+    column_formats=None,
+    upper_headers=False,
+    out=None,
+    buffer_rows=None,
+    **options,
+):
     if name not in TableFormatter._formats:
         __import__(f"{__package__}.formats.{name}")
     formatter_cls = TableFormatter._formats.get(name)
@@ -48,13 +111,18 @@ def create_formatter(name, column_formats=None, upper_headers=False):
         class formatter_cls(UpperHeadersMixin, formatter_cls):
             pass
 
-    return formatter_cls()
+    return formatter_cls(out, buffer_rows, **options)
 
 
 def print_table(records, fields, formatter):
     if not isinstance(formatter, TableFormatter):
         raise TypeError("Expected a TableFormatter")
     formatter.headings(fields)
-    for r in records:
-        rowdata = [getattr(r, fieldname) for fieldname in fields]
-        formatter.row(rowdata)
+    if len(fields) == 1:
+        getter = attrgetter(fields[0])
+        formatter.rows((getter(r),) for r in records)
+    elif fields:
+        formatter.rows(map(attrgetter(*fields), records))
+    else:
+        formatter.rows(() for r in records)
+    formatter.flush()
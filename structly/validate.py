@@ -2,8 +2,19 @@
 
 import decimal
 import inspect
+import textwrap
 from functools import wraps
 
+# Input that is known to be good can skip validation entirely. When set,
+# Structure classes and validated/enforce functions defined from then on
+# are created without any checks.
+trusted = False
+
+
+def set_trusted(flag=True):
+    global trusted
+    trusted = flag
+
 
 class Validator:
     def __init__(self, name=None):
@@ -25,16 +36,89 @@ class Validator:
     @classmethod
     def __init_subclass__(cls):
         cls.validators[cls.__name__] = cls
+        cls.compile_check()
+
+    # Validators describe their test as source code in check_code rather
+    # than as a cooperative check() method. The code of every class in the
+    # MRO is compiled into one check() function when the class is created.
+    check_code = ""
+
+    @classmethod
+    def compile_check(cls):
+        if any(_hand_written(base) for base in cls.__mro__):
+            # A hand-written check() somewhere in the MRO relies on super(),
+            # so leave this class to the normal method lookup
+            return
+        code = "def check(cls, value):\n"
+        # A subclass's hand-written check() may reach this one through
+        # super(), in which case the rest of its own MRO must be checked
+        code += "    if cls is not owner:\n"
+        code += "        return owner._check_from(cls, value)\n"
+        code += _check_source(cls.__mro__)
+        env = {"expected_type": getattr(cls, "expected_type", None), "owner": cls}
+        exec(code, env)
+        cls.check = classmethod(env["check"])
+        cls._compiled_check = True
+
+    @classmethod
+    def _check_from(cls, subclass, value):
+        # Run the checks from cls onwards in the MRO of subclass, up to the
+        # next hand-written check(), which is then called in turn
+        try:
+            check, last = _chains[cls, subclass]
+        except KeyError:
+            mro = subclass.__mro__
+            classes = [cls]
+            for base in mro[mro.index(cls) + 1 : mro.index(Validator) + 1]:
+                if _hand_written(base):
+                    break
+                classes.append(base)
+            code = "def check(value):\n" + _check_source(classes)
+            env = {"expected_type": getattr(subclass, "expected_type", None)}
+            exec(code, env)
+            check, last = _chains[cls, subclass] = (env["check"], classes[-1])
+        value = check(value)
+        if last is Validator:
+            return value
+        return super(last, subclass).check(value)
+
+
+# Compiled checks for each (class, subclass) pair, see Validator._check_from
+_chains = {}
+
+
+def _hand_written(cls):
+    return (
+        cls is not Validator
+        and "check" in vars(cls)
+        and not vars(cls).get("_compiled_check", False)
+    )
+
+
+def _check_source(classes):
+    # The body of a check function running the check_code of classes
+    code = ""
+    for base in classes:
+        source = textwrap.dedent(vars(base).get("check_code", ""))
+        code += textwrap.indent(source, "    ")
+    return code + "    return value\n"
 
 
 class Typed(Validator):
     expected_type = object
 
-    @classmethod
-    def check(cls, value):
-        if not isinstance(value, cls.expected_type):
-            raise TypeError(f"Expected {cls.expected_type}")
-        return super().check(value)
+    def __init__(self, name=None, intern=False):
+        # With intern, Structure.from_row() shares one copy of each value
+        # between instances, for strings that repeat a lot
+        if intern and not issubclass(self.expected_type, str):
+            raise TypeError(f"Only strings can be interned, not {self.expected_type}")
+        super().__init__(name)
+        self.intern = intern
+
+    check_code = """
+        if not isinstance(value, expected_type):
+            raise TypeError(f"Expected {expected_type}")
+    """
 
 
 _typed_classes = [
@@ -53,19 +137,17 @@ globals().update(
 
 
 class Positive(Validator):
-    @classmethod
-    def check(cls, value):
+    check_code = """
         if value < 0:
             raise ValueError("Expected >= 0")
-        return super().check(value)
+    """
 
 
 class NonEmpty(Validator):
-    @classmethod
-    def check(cls, value):
+    check_code = """
         if len(value) == 0:
             raise ValueError("Must be non-empty")
-        return super().check(value)
+    """
 
 
 class PositiveInteger(Integer, Positive):
@@ -128,8 +210,85 @@ class ValidatedFunction:
         return result
 
 
+def compile_wrapper(func, sig, checks, return_check=None):
+    """
+    Generate a checking wrapper whose parameter list mirrors the signature
+    of func, so arguments are checked by name without Signature.bind. A
+    parameter left at its default value is not checked, as with bind.
+    """
+    # The helpers are globals of the generated code, named with a prefix
+    # that no parameter starts with so that none of them can be shadowed
+    p = "_"
+    while any(name.startswith(p) for name in sig.parameters):
+        p += "_"
+    env = {f"{p}func": func}
+    params = []
+    args = []
+    code = ""
+    kind = None
+    for n, param in enumerate(sig.parameters.values()):
+        if kind is param.POSITIONAL_ONLY and param.kind is not kind:
+            params.append("/")
+        if param.kind is param.KEYWORD_ONLY and kind is not param.KEYWORD_ONLY:
+            params.append("*")
+        kind = param.kind
+        name = param.name
+        if param.default is param.empty:
+            params.append(name)
+        else:
+            env[f"{p}default{n}"] = param.default
+            params.append(f"{name}={p}default{n}")
+        args.append(f"{name}={name}" if kind is param.KEYWORD_ONLY else name)
+        if name in checks:
+            env[f"{p}check{n}"] = checks[name].check
+            if param.default is param.empty:
+                code += f"        {p}check{n}({name})\n"
+            else:
+                code += f"        if {name} is not {p}default{n}:\n"
+                code += f"            {p}check{n}({name})\n"
+    if kind is inspect.Parameter.POSITIONAL_ONLY:
+        params.append("/")
+
+    env[f"{p}errors"] = "Bad Arguments\n" + "\n".join(
+        f"    {name}: Expected {checks[name]}"
+        for name in sig.parameters
+        if name in checks
+    )
+    source = f"def wrapper({', '.join(params)}):\n"
+    if code:
+        source += "    try:\n" + code
+        source += "    except TypeError:\n"
+        source += f"        raise TypeError({p}errors) from None\n"
+    source += f"    {p}retval = {p}func({', '.join(args)})\n"
+    if return_check is not None:
+        env[f"{p}return"] = return_check.check
+        source += "    try:\n"
+        source += f"        {p}return({p}retval)\n"
+        source += f"    except TypeError as {p}e:\n"
+        source += f"        raise TypeError(f'Bad return: {{{p}e}}') from None\n"
+    source += f"    return {p}retval\n"
+    exec(source, env)
+    return wraps(func)(env["wrapper"])
+
+
+def _has_varargs(sig):
+    return any(
+        param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD)
+        for param in sig.parameters.values()
+    )
+
+
 def validated(func):
+    if trusted:
+        return func
     sig = inspect.signature(func)
+    if not _has_varargs(sig):
+        checks = {
+            name: val
+            for name, val in func.__annotations__.items()
+            if name not in ("self", "return")
+        }
+        return compile_wrapper(func, sig, checks, func.__annotations__.get("return"))
 
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -159,7 +318,14 @@ def validated(func):
 
 def enforce(**typekwargs):
     def decorator(func):
+        if trusted:
+            return func
         sig = inspect.signature(func)
+        if not _has_varargs(sig):
+            checks = {
+                name: val for name, val in typekwargs.items() if name != "return_"
+            }
+            return compile_wrapper(func, sig, checks, typekwargs.get("return_"))
 
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -0,0 +1,230 @@
+# testreader.py
+
+import bz2
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from stock import Stock
+from structly import reader
+from structly.reader import (
+    csv_as_dicts,
+    csv_as_instances,
+    iter_csv_as_dicts,
+    iter_csv_as_instances,
+    open_csv,
+    read_csv_as_columns,
+    read_csv_as_dicts,
+    read_csv_as_instances,
+    read_csv_parallel,
+    read_many,
+    scan_csv_as_columns,
+)
+
+PORTFOLIO = "Data/portfolio.csv"
+MISSING = "Data/missing.csv"
+TYPES = [str, int, float]
+
+
+class TestIterReaders(unittest.TestCase):
+    def test_iter_instances(self):
+        records = iter_csv_as_instances(PORTFOLIO, Stock)
+        self.assertEqual(next(records), Stock("AA", 100, 32.2))
+        self.assertEqual(len(list(records)), 6)
+        self.assertEqual(
+            list(iter_csv_as_instances(PORTFOLIO, Stock)),
+            read_csv_as_instances(PORTFOLIO, Stock),
+        )
+
+    def test_iter_dicts(self):
+        records = list(iter_csv_as_dicts(PORTFOLIO, TYPES))
+        self.assertEqual(records, read_csv_as_dicts(PORTFOLIO, TYPES))
+        self.assertEqual(records[1], {"name": "IBM", "shares": 50, "price": 91.1})
+
+    def test_close(self):
+        files = []
+
+        def opener(*args):
+            file = open_csv(*args)
+            files.append(file)
+            return file
+
+        with mock.patch.object(reader, "open_csv", opener):
+            for records in (
+                iter_csv_as_dicts(PORTFOLIO, TYPES),
+                iter_csv_as_instances(PORTFOLIO, Stock),
+            ):
+                next(records)
+                self.assertFalse(files[-1].closed)
+                records.close()
+                self.assertTrue(files[-1].closed)
+
+    def test_log_bad_rows(self):
+        with self.assertLogs("structly.reader", "WARNING") as logs:
+            records = list(iter_csv_as_instances(MISSING, Stock))
+        self.assertEqual(len(records), 20)
+        self.assertEqual(len(logs.records), 8)
+        self.assertEqual(
+            logs.records[0].getMessage(), "Row 4: Bad row: ['C', '', '53.08']"
+        )
+
+
+class TestErrors(unittest.TestCase):
+    def test_raise(self):
+        with self.assertRaisesRegex(ValueError, "Row 4"):
+            read_csv_as_dicts(MISSING, TYPES, errors="raise")
+
+    def test_ignore(self):
+        with self.assertNoLogs("structly.reader"):
+            records = read_csv_as_instances(MISSING, Stock, errors="ignore")
+        self.assertEqual(len(records), 20)
+
+    def test_collect(self):
+        records, bad_rows = read_csv_as_dicts(MISSING, TYPES, errors="collect")
+        self.assertEqual(len(records), 20)
+        self.assertEqual(list(bad_rows.column("rownum")), [4, 7, 8, 13, 17, 19, 22, 26])
+        self.assertEqual(bad_rows[1]["row"], ["DIS", "50", "N/A"])
+        self.assertEqual(bad_rows[1]["error"], ValueError)
+
+    def test_collect_streaming(self):
+        with self.assertRaises(ValueError):
+            next(iter_csv_as_dicts(PORTFOLIO, TYPES, errors="collect"))
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            read_csv_as_dicts(PORTFOLIO, TYPES, errors="skip")
+
+
+class TestWhereFields(unittest.TestCase):
+    def test_where(self):
+        records = read_csv_as_instances(
+            PORTFOLIO, Stock, where=lambda row: row["name"] == "IBM"
+        )
+        self.assertEqual(records, [Stock("IBM", 50, 91.1), Stock("IBM", 100, 70.44)])
+
+    def test_fields(self):
+        records = read_csv_as_dicts(PORTFOLIO, [str, float], fields=["name", "price"])
+        self.assertEqual(len(records), 7)
+        self.assertEqual(records[0], {"name": "AA", "price": 32.2})
+
+    def test_where_fields(self):
+        # where sees every column, even those that fields leaves out
+        records = read_csv_as_dicts(
+            PORTFOLIO,
+            [float],
+            fields=["price"],
+            where=lambda row: int(row["shares"]) >= 100,
+        )
+        self.assertEqual(
+            records,
+            [{"price": 32.2}, {"price": 83.44}, {"price": 51.23}, {"price": 70.44}],
+        )
+
+    def test_short_rows(self):
+        lines = ["name,shares", "", "AA,100"]
+        self.assertEqual(
+            csv_as_dicts(lines, [str, int], intern=["name"]),
+            [{}, {"name": "AA", "shares": 100}],
+        )
+        with self.assertLogs("structly.reader", "WARNING") as logs:
+            records = csv_as_dicts(lines, [str], fields=["name"])
+        self.assertEqual(records, [{"name": "AA"}])
+        self.assertEqual(logs.output, ["WARNING:structly.reader:Row 1: Bad row: []"])
+
+
+class TestBadRows(unittest.TestCase):
+    def test_short_instances(self):
+        lines = ["name,shares,price", "AA,100", "IBM,50,91.1"]
+        with self.assertLogs("structly.reader", "WARNING") as logs:
+            records = csv_as_instances(lines, Stock)
+        self.assertEqual(records, [Stock("IBM", 50, 91.1)])
+        self.assertEqual(
+            logs.output, ["WARNING:structly.reader:Row 1: Bad row: ['AA', '100']"]
+        )
+        records, bad_rows = csv_as_instances(lines, Stock, errors="collect")
+        self.assertEqual(records, [Stock("IBM", 50, 91.1)])
+        self.assertEqual(bad_rows[0]["row"], ["AA", "100"])
+
+    def test_collect_raw_row(self):
+        # Bad rows are recorded as read, not as projected onto fields
+        lines = ["name,shares,price", "AA,x,32.2"]
+        _, bad_rows = csv_as_dicts(
+            lines, [str, int], fields=["name", "shares"], errors="collect"
+        )
+        self.assertEqual(bad_rows[0]["row"], ["AA", "x", "32.2"])
+
+    def test_intern(self):
+        records = read_csv_as_dicts(PORTFOLIO, TYPES, intern=["name"])
+        self.assertIs(records[1]["name"], records[6]["name"])
+
+
+class TestFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.expected = read_csv_as_instances(PORTFOLIO, Stock)
+
+    def test_gzip(self):
+        self.assertEqual(read_csv_as_instances(PORTFOLIO + ".gz", Stock), self.expected)
+        with open_csv(PORTFOLIO + ".gz", threaded=True) as file:
+            with open(PORTFOLIO) as plain:
+                self.assertEqual(file.read(), plain.read())
+
+    def test_magic_number(self):
+        # Compressed files are recognised without an extension too
+        filename = os.path.join(self.tmpdir, "portfolio")
+        with open(PORTFOLIO, "rb") as src, bz2.open(filename, "wb") as dst:
+            dst.write(src.read())
+        self.assertEqual(read_csv_as_instances(filename, Stock), self.expected)
+
+    def test_path(self):
+        path = pathlib.Path(PORTFOLIO)
+        self.assertEqual(read_csv_as_instances(path, Stock), self.expected)
+        self.assertEqual(
+            read_csv_as_instances(path.with_suffix(".csv.gz"), Stock), self.expected
+        )
+
+    def test_parallel(self):
+        # Enough rows for many small chunks, which must come back in order
+        filename = os.path.join(self.tmpdir, "portfolio.csv")
+        with open(filename, "w") as f:
+            f.write("name,shares,price\n")
+            for n in range(1, 500):
+                f.write(f"S{n},{n},{n / 4}\n")
+        expected = read_csv_as_instances(filename, Stock)
+        records = read_csv_parallel(filename, Stock, workers=2, chunksize=256)
+        self.assertEqual(records, expected)
+
+    def test_read_many(self):
+        for name in ("b.csv", "a.csv", "c.csv"):
+            shutil.copy(PORTFOLIO, os.path.join(self.tmpdir, name))
+        results = list(read_many(self.tmpdir, Stock, max_open=2))
+        names = [os.path.basename(filename) for filename, _ in results]
+        self.assertEqual(names, ["a.csv", "b.csv", "c.csv"])
+        for _, records in results:
+            self.assertEqual(records, self.expected)
+        results = list(read_many(pathlib.Path(self.tmpdir), Stock))
+        self.assertEqual(len(results), 3)
+
+
+class TestColumns(unittest.TestCase):
+    def test_columns(self):
+        data = read_csv_as_columns(PORTFOLIO, TYPES, categorical=["name"])
+        self.assertEqual(len(data), 7)
+        self.assertEqual(data[1], {"name": "IBM", "shares": 50, "price": 91.1})
+        self.assertEqual(list(data.column("shares")), [100, 50, 150, 200, 95, 50, 100])
+        self.assertEqual(len(data.column("name").categories), 5)
+        self.assertEqual(list(data[2:4].column("name")), ["CAT", "MSFT"])
+        self.assertEqual(data[2:4][0]["price"], 83.44)
+
+    def test_scan(self):
+        data = scan_csv_as_columns(PORTFOLIO, [float], columns=["price"])
+        expected = read_csv_as_columns(PORTFOLIO, TYPES).column("price")
+        self.assertEqual(list(data.column("price")), list(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
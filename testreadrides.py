@@ -0,0 +1,179 @@
+# testreadrides.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import readrides
+import ridequery
+from readrides import RideData
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+RIDES = [
+    ("22", "01/01/2001", "U", 5),
+    ("22", "02/02/2011", "W", 7),
+    ("3", "02/02/2011", "W", 1),
+    ("3", "12/31/2011", "U", 2),
+    ("22", "01/01/2012", "U", 9),
+]
+
+
+def make_rides():
+    rides = RideData()
+    for route, date, daytype, numrides in RIDES:
+        rides.append(
+            {"route": route, "date": date, "daytype": daytype, "rides": numrides}
+        )
+    return rides
+
+
+class TestRideData(unittest.TestCase):
+    def setUp(self):
+        self.rides = make_rides()
+
+    def test_index(self):
+        self.assertEqual(len(self.rides), 5)
+        self.assertEqual(
+            self.rides[1],
+            {"route": "22", "date": "02/02/2011", "daytype": "W", "rides": 7},
+        )
+        self.assertEqual(self.rides[-1]["rides"], 9)
+        with self.assertRaises(IndexError):
+            self.rides[5]
+
+    def test_slice(self):
+        view = self.rides[1:4]
+        self.assertEqual(len(view), 3)
+        self.assertEqual([ride["rides"] for ride in view], [7, 1, 2])
+        self.assertEqual([ride["rides"] for ride in view[::-1]], [2, 1, 7])
+        self.assertEqual(view[-1]["route"], "3")
+        self.assertIs(view.numrides, self.rides.numrides)
+        self.assertEqual(len(self.rides[4:1]), 0)
+
+    def test_append_to_view(self):
+        with self.assertRaises(TypeError):
+            self.rides[1:3].append(self.rides[0])
+
+    def test_dates(self):
+        dates = self.rides.dates
+        self.assertEqual(list(dates), [ride[1] for ride in RIDES])
+        self.assertEqual(list(dates.years), [2001, 2011, 2011, 2011, 2012])
+        self.assertEqual(list(dates.months), [1, 2, 2, 12, 1])
+        self.assertEqual(dates.days[1], readrides.parse_date("02/02/2011"))
+        self.assertEqual(dates.days[1], dates.days[2])
+        self.assertEqual(list(dates[3:]), ["12/31/2011", "01/01/2012"])
+
+
+class TestRideIndex(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        self.filename = os.path.join(tmpdir, "rides.csv")
+        self.write(RIDES)
+
+    def write(self, rides):
+        with open(self.filename, "w") as f:
+            f.write("route,date,daytype,rides\n")
+            for ride in rides:
+                f.write(",".join(map(str, ride)) + "\n")
+
+    def test_lookup(self):
+        with readrides.RideIndex(self.filename) as index:
+            self.assertEqual(
+                index.lookup("22", "02/02/2011"),
+                [{"route": "22", "date": "02/02/2011", "daytype": "W", "rides": 7}],
+            )
+            self.assertEqual(index.lookup("3", "01/01/2001"), [])
+            self.assertEqual(index.lookup("99", "01/01/2001"), [])
+        self.assertTrue(os.path.exists(self.filename + ".idx"))
+
+    def test_rebuild(self):
+        readrides.RideIndex(self.filename).close()
+        # A changed file makes the index stale
+        self.write(RIDES + [("3", "02/02/2011", "U", 4)])
+        with readrides.RideIndex(self.filename) as index:
+            rides = index.lookup("3", "02/02/2011")
+        self.assertEqual([ride["rides"] for ride in rides], [1, 4])
+
+
+class TestGroupSum(unittest.TestCase):
+    # Run without NumPy, whether or not it is installed
+    np = None
+
+    def setUp(self):
+        patcher = mock.patch.object(readrides, "np", self.np)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.rides = make_rides()
+
+    def test_totals(self):
+        self.assertEqual(self.rides.group_sum(), {"22": 21, "3": 3})
+        self.assertEqual(self.rides.group_sum("daytype"), {"U": 16, "W": 8})
+
+    def test_where_value(self):
+        totals = self.rides.group_sum(where={"daytype": "W"})
+        self.assertEqual(totals, {"22": 7, "3": 1})
+        totals = self.rides.group_sum(where={"route": "22", "date": "02/02/2011"})
+        self.assertEqual(totals, {"22": 7})
+
+    def test_where_wrong_type(self):
+        self.assertEqual(self.rides.group_sum(where={"route": 22}), {})
+        self.assertEqual(self.rides.group_sum(where={"rides": "5"}), {})
+
+    def test_where_predicate(self):
+        totals = self.rides.group_sum(where={"date": lambda d: d.endswith("/2011")})
+        self.assertEqual(totals, {"22": 7, "3": 3})
+        totals = self.rides.group_sum(where={"rides": lambda n: n > 4})
+        self.assertEqual(totals, {"22": 21})
+
+    def test_where_dates(self):
+        self.assertEqual(self.rides.group_sum(where={"year": 2011}), {"22": 7, "3": 3})
+        span = readrides.date_span("02/01/2011", "12/31/2011")
+        self.assertEqual(self.rides.group_sum(where={"date": span}), {"22": 7, "3": 3})
+        self.assertEqual(
+            self.rides.group_sum(where={"year": range(2001, 2012, 10)}),
+            {"22": 12, "3": 3},
+        )
+
+    def test_slice(self):
+        self.assertEqual(self.rides[1:4].group_sum(), {"22": 7, "3": 3})
+        self.assertEqual(self.rides[::-2].group_sum(), {"22": 14, "3": 1})
+        self.assertEqual(self.rides[3:1].group_sum(), {})
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestGroupSumNumPy(TestGroupSum):
+    np = numpy
+
+
+class TestQuery(unittest.TestCase):
+    def test_run(self):
+        query = ridequery.Query()
+        query.register("routes", ridequery.Distinct("route"))
+        query.register("weekdays", ridequery.Sum(where=lambda r: r.daytype == "W"))
+        query.register("totals", ridequery.GroupSum("route"))
+        query.register(
+            "increase",
+            ridequery.GroupChange("route", "rides", ridequery.year, "2001", "2011"),
+        )
+        results = query.run(ridequery.Ride(*ride) for ride in RIDES)
+        self.assertEqual(results["routes"], {"22", "3"})
+        self.assertEqual(results["weekdays"], 8)
+        self.assertEqual(results["totals"], {"22": 21, "3": 3})
+        self.assertEqual(results["increase"], {"22": 2, "3": 3})
+
+    def test_register_twice(self):
+        query = ridequery.Query()
+        query.register("total", ridequery.Sum())
+        with self.assertRaises(ValueError):
+            query.register("total", ridequery.Sum())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,13 @@
 import unittest
 
 from stock import Stock
+from structly import Structure
+
+
+class SlottedStock(Structure, slots=True):
+    name = String()
+    shares = PositiveInteger()
+    price = PositiveFloat()
 
 
 class TestStock(unittest.TestCase):
@@ -28,12 +35,30 @@ class TestStock(unittest.TestCase):
         s.sell(60)
         self.assertEqual(s.shares, 40)
 
+    def test_bad_sell(self):
+        s = Stock("GOOG", 100, 490.1)
+        with self.assertRaises(TypeError):
+            s.sell("60")
+        with self.assertRaises(ValueError):
+            s.sell(-60)
+        self.assertEqual(s.shares, 100)
+
     def test_from_row(self):
         s = Stock.from_row(("GOOG", 100, 490.1))
         self.assertEqual(s.name, "GOOG")
         self.assertEqual(s.shares, 100)
         self.assertEqual(s.price, 490.1)
 
+    def test_from_row_convert(self):
+        s = Stock.from_row(["GOOG", "100", "490.1"])
+        self.assertEqual(s, Stock("GOOG", 100, 490.1))
+        with self.assertRaises(ValueError):
+            Stock.from_row(["GOOG", "-100", "490.1"])
+
+    def test_from_row_short(self):
+        with self.assertRaises(ValueError):
+            Stock.from_row(["GOOG", "100"])
+
     def test_repr(self):
         s = Stock("GOOG", 100, 490.1)
         self.assertEqual(repr(s), "Stock('GOOG', 100, 490.1)")
@@ -62,6 +87,28 @@ class TestStock(unittest.TestCase):
         with self.assertRaises(AttributeError):
             s.share = 50
 
+    def test_slots(self):
+        s = SlottedStock("GOOG", 100, 490.1)
+        self.assertFalse(hasattr(s, "__dict__"))
+        self.assertEqual(repr(s), "SlottedStock('GOOG', 100, 490.1)")
+        self.assertEqual(SlottedStock.from_row(["GOOG", "100", "490.1"]), s)
+        with self.assertRaises(ValueError):
+            s.shares = -50
+        with self.assertRaises(AttributeError):
+            s.share = 50
+
+    def test_trusted(self):
+        class TrustedStock(Structure, trusted=True):
+            name = String()
+            shares = PositiveInteger()
+
+        s = TrustedStock.from_row(["GOOG", "-100"])
+        self.assertEqual(s.shares, -100)
+        s.shares = "50"
+        self.assertEqual(s.shares, "50")
+        with self.assertRaises(AttributeError):
+            s.share = 50
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,176 @@
+# testtableformat.py
+
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from stock import Stock
+from structly.reader import read_binary_columns
+from structly.tableformat import create_formatter, print_table
+
+PORTFOLIO = [Stock("AA", 100, 32.2), Stock("IBM", 50, 91.1)]
+FIELDS = ["name", "shares", "price"]
+
+
+def table(name, fields=FIELDS, records=PORTFOLIO, **options):
+    out = io.StringIO()
+    print_table(records, fields, create_formatter(name, out=out, **options))
+    return out.getvalue()
+
+
+class TestFormats(unittest.TestCase):
+    def test_text(self):
+        self.assertEqual(
+            table("text"),
+            "      name     shares      price\n"
+            "---------- ---------- ---------- \n"
+            "        AA        100       32.2\n"
+            "       IBM         50       91.1\n",
+        )
+
+    def test_csv(self):
+        self.assertEqual(table("csv"), "name,shares,price\nAA,100,32.2\nIBM,50,91.1\n")
+        self.assertEqual(table("csv", ["name"]), "name\nAA\nIBM\n")
+
+    def test_csv_quoting(self):
+        out = io.StringIO()
+        formatter = create_formatter("csv", out=out)
+        formatter.headings(["name", "note"])
+        formatter.row(["AA", 'says "hi", twice'])
+        formatter.close()
+        self.assertEqual(out.getvalue(), 'name,note\nAA,"says ""hi"", twice"\n')
+
+    def test_html(self):
+        self.assertEqual(
+            table("html", ["name", "shares"]),
+            "<tr> <th>name</th> <th>shares</th> </tr>\n"
+            "<tr> <td>AA</td> <td>100</td> </tr>\n"
+            "<tr> <td>IBM</td> <td>50</td> </tr>\n",
+        )
+
+    def test_options(self):
+        self.assertEqual(
+            table(
+                "csv",
+                ["name", "price"],
+                column_formats=["%s", "%0.2f"],
+                upper_headers=True,
+            ),
+            "NAME,PRICE\nAA,32.20\nIBM,91.10\n",
+        )
+
+    def test_rows_matches_row(self):
+        for name in ("text", "csv", "html"):
+            out = io.StringIO()
+            formatter = create_formatter(name, out=out)
+            formatter.headings(FIELDS)
+            for stock in PORTFOLIO:
+                formatter.row(list(stock))
+            formatter.close()
+            self.assertEqual(out.getvalue(), table(name))
+
+    def test_unknown(self):
+        with self.assertRaises(ImportError):
+            create_formatter("xml")
+
+
+class CountingIO(io.StringIO):
+    # Counts the calls of write()
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestBuffering(unittest.TestCase):
+    def test_stdout_row(self):
+        # Rows written to the default stdout show up straight away
+        with redirect_stdout(io.StringIO()) as out:
+            formatter = create_formatter("csv")
+            formatter.headings(["name", "shares"])
+            formatter.row(["AA", 100])
+            self.assertEqual(out.getvalue(), "name,shares\nAA,100\n")
+
+    def test_stdout_table(self):
+        # print_table writes a whole table to stdout in blocks, in every format
+        records = [Stock("AA", n, 32.2) for n in range(1, 3001)]
+        for name in ("text", "csv", "html"):
+            with redirect_stdout(CountingIO()) as out:
+                print_table(records, FIELDS, create_formatter(name))
+            self.assertEqual(out.getvalue(), table(name, records=records))
+            self.assertLessEqual(out.writes, 5)
+
+    def test_buffered_out(self):
+        out = io.StringIO()
+        formatter = create_formatter("csv", out=out, buffer_rows=2)
+        formatter.headings(["name"])
+        self.assertEqual(out.getvalue(), "")
+        formatter.row(["AA"])
+        self.assertEqual(out.getvalue(), "name\nAA\n")
+        formatter.row(["IBM"])
+        self.assertEqual(out.getvalue(), "name\nAA\n")
+        formatter.close()
+        self.assertEqual(out.getvalue(), "name\nAA\nIBM\n")
+
+
+class TestBinary(unittest.TestCase):
+    def write_and_read(self, headers, rows, **options):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "table.bin")
+            with open(filename, "wb") as out:
+                formatter = create_formatter("binary", out=out, **options)
+                formatter.headings(headers)
+                for rowdata in rows:
+                    formatter.row(rowdata)
+                formatter.close()
+            data = read_binary_columns(filename)
+            return data.column_types, [list(column) for column in data.column_data]
+
+    def test_round_trip(self):
+        rows = [("AA", 100, 32.2), ("IBM", 50, 91.1), ("CAT", 150, 83.44)]
+        types, columns = self.write_and_read(
+            ["name", "shares", "price"], rows, buffer_rows=2
+        )
+        self.assertEqual(types, [str, int, float])
+        self.assertEqual(columns, [list(column) for column in zip(*rows)])
+
+    def test_mixed_types(self):
+        # Types are taken from the whole first block, not just its first row
+        rows = [(1, 1, "a"), (2.5, 2, None)]
+        types, columns = self.write_and_read(["x", "n", "s"], rows)
+        self.assertEqual(types, [float, int, str])
+        self.assertEqual(columns, [[1.0, 2.5], [1, 2], ["a", "None"]])
+
+    def test_types(self):
+        rows = [(1, 1), (2.5, 2)]
+        types, columns = self.write_and_read(
+            ["x", "n"], rows, buffer_rows=1, types=[float, int]
+        )
+        self.assertEqual(types, [float, int])
+        self.assertEqual(columns, [[1.0, 2.5], [1, 2]])
+
+    def test_later_block(self):
+        formatter = create_formatter("binary", out=io.BytesIO(), buffer_rows=1)
+        formatter.headings(["n"])
+        formatter.row([1])
+        with self.assertRaisesRegex(TypeError, "pass types="):
+            formatter.row([2.5])
+
+    def test_stdout(self):
+        # Rows are buffered by buffer_rows even when writing to stdout
+        out = io.TextIOWrapper(io.BytesIO())
+        with redirect_stdout(out):
+            formatter = create_formatter("binary")
+            formatter.headings(["n"])
+            formatter.row([1])
+            formatter.row([2.5])
+            self.assertEqual(out.buffer.getvalue(), b"")
+            formatter.close()
+        self.assertTrue(out.buffer.getvalue().startswith(b"STRUCTLY"))
+
+
+if __name__ == "__main__":
+    unittest.main()
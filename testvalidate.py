@@ -0,0 +1,101 @@
+# testvalidate.py
+
+import unittest
+
+from structly.validate import (
+    Integer,
+    NonEmpty,
+    PositiveInteger,
+    String,
+    Validator,
+    enforce,
+    validated,
+)
+
+
+class Strip(Validator):
+    # A hand-written, cooperative check() mixed in with compiled ones
+    @classmethod
+    def check(cls, value):
+        return super().check(value.strip())
+
+
+class StrippedName(Strip, String, NonEmpty):
+    pass
+
+
+class NameStripped(String, Strip, NonEmpty):
+    pass
+
+
+# Parameters named like the generated helpers must not shadow them. Defined
+# here, outside a class, so that the names are not mangled.
+@validated
+def total(__func: Integer, __check0: Integer, retval: Integer = 1):
+    return __func + __check0 + retval
+
+
+class TestValidators(unittest.TestCase):
+    def test_compiled(self):
+        self.assertEqual(PositiveInteger.check(10), 10)
+        with self.assertRaises(TypeError):
+            PositiveInteger.check(1.5)
+        with self.assertRaises(ValueError):
+            PositiveInteger.check(-1)
+
+    def test_intern(self):
+        self.assertTrue(String(intern=True).intern)
+        with self.assertRaises(TypeError):
+            Integer(intern=True)
+
+    def test_hand_written_first(self):
+        self.assertEqual(StrippedName.check(" GOOG "), "GOOG")
+        with self.assertRaises(ValueError):
+            StrippedName.check("")
+        with self.assertRaises(ValueError):
+            StrippedName.check("   ")
+
+    def test_hand_written_between(self):
+        self.assertEqual(NameStripped.check(" GOOG "), "GOOG")
+        with self.assertRaises(TypeError):
+            NameStripped.check(10)
+        with self.assertRaises(ValueError):
+            NameStripped.check("   ")
+
+
+class TestValidated(unittest.TestCase):
+    def test_validated(self):
+        @validated
+        def add(x: Integer, y: Integer = 0) -> Integer:
+            return x + y
+
+        self.assertEqual(add(2, 3), 5)
+        self.assertEqual(add(2), 2)
+        self.assertEqual(add.__name__, "add")
+        with self.assertRaises(TypeError):
+            add(2, "3")
+
+    def test_bad_return(self):
+        @validated
+        def name(x: Integer) -> String:
+            return x
+
+        with self.assertRaisesRegex(TypeError, "Bad return"):
+            name(1)
+
+    def test_enforce_lambda(self):
+        double = enforce(x=Integer, return_=Integer)(lambda x: 2 * x)
+        self.assertEqual(double(2), 4)
+        self.assertEqual(double.__name__, "<lambda>")
+        with self.assertRaises(TypeError):
+            double("2")
+
+    def test_parameter_names(self):
+        self.assertEqual(total(1, 2), 4)
+        self.assertEqual(total(1, 2, retval=3), 6)
+        with self.assertRaises(TypeError):
+            total(1, 2, retval="3")
+
+
+if __name__ == "__main__":
+    unittest.main()